@@ -0,0 +1,34 @@
+from unittest import mock
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from tests.helpers import SOURCE_BUCKET, TARGET_BUCKET
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    # the app connects to Pulsar on import
+    with mock.patch("eodhp_utils.runner.get_pulsar_client"):
+        import app
+
+    return app
+
+
+@pytest.fixture(autouse=True)
+def aws_credentials(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-2")
+
+
+@pytest.fixture
+def s3_client():
+    with mock_aws():
+        client = boto3.client("s3", region_name="eu-west-2")
+        for bucket in (SOURCE_BUCKET, TARGET_BUCKET):
+            client.create_bucket(
+                Bucket=bucket, CreateBucketConfiguration={"LocationConstraint": "eu-west-2"}
+            )
+        yield client
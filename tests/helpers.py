@@ -0,0 +1,2 @@
+SOURCE_BUCKET = "source-bucket"
+TARGET_BUCKET = "target-bucket"
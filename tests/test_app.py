@@ -0,0 +1,442 @@
+import concurrent.futures
+import gzip
+import json
+import math
+import time
+
+import orjson
+import pytest
+from botocore.exceptions import ClientError
+from elasticsearch import SerializationError
+from fastapi.testclient import TestClient
+
+from tests.helpers import SOURCE_BUCKET, TARGET_BUCKET
+
+
+@pytest.fixture(autouse=True)
+def reset_state(app_module):
+    app_module.last_harvest_times.clear()
+    app_module.harvested_metadata_cache.clear()
+
+
+def test_list_files_s3_single_page(app_module, s3_client):
+    keys = ["ws/eodh-config/a.json", "ws/eodh-config/sub/b.json"]
+    for key in keys + ["other/eodh-config/c.json"]:
+        s3_client.put_object(Bucket=SOURCE_BUCKET, Key=key, Body=b"{}")
+
+    contents = app_module.list_files_s3(SOURCE_BUCKET, "ws/eodh-config/", s3_client)
+
+    assert sorted(details["Key"] for details in contents) == keys
+
+
+@pytest.fixture
+def upload_file_s3(app_module, mocker):
+    return mocker.patch.object(app_module, "upload_file_s3", wraps=app_module.upload_file_s3)
+
+
+def test_upload_policy_s3_skips_unchanged_policy(app_module, s3_client, upload_file_s3):
+    app_module.upload_policy_s3(b'{"a": 1}', TARGET_BUCKET, "policy.json", s3_client)
+    app_module.upload_policy_s3(b'{"a": 1}', TARGET_BUCKET, "policy.json", s3_client)
+
+    assert upload_file_s3.call_count == 1
+
+
+def test_upload_policy_s3_uploads_externally_changed_policy(app_module, s3_client, upload_file_s3):
+    app_module.upload_policy_s3(b'{"a": 1}', TARGET_BUCKET, "policy.json", s3_client)
+    s3_client.delete_object(Bucket=TARGET_BUCKET, Key="policy.json")
+    app_module.upload_policy_s3(b'{"a": 1}', TARGET_BUCKET, "policy.json", s3_client)
+
+    assert upload_file_s3.call_count == 2
+
+
+def test_upload_policy_s3_uploads_when_head_fails(app_module, s3_client, upload_file_s3, mocker):
+    mocker.patch.object(
+        s3_client,
+        "head_object",
+        side_effect=ClientError({"Error": {"Code": "403", "Message": "Forbidden"}}, "HeadObject"),
+    )
+
+    app_module.upload_policy_s3(b'{"a": 1}', TARGET_BUCKET, "policy.json", s3_client)
+
+    assert upload_file_s3.call_count == 1
+
+
+def test_generate_access_policies_always_notifies(app_module, s3_client, monkeypatch, mocker):
+    for name in (
+        "block_object_store_data_access_control_s3_bucket",
+        "catalogue_data_access_control_s3_bucket",
+        "workflow_access_control_s3_bucket",
+    ):
+        monkeypatch.setattr(app_module, name, TARGET_BUCKET)
+    catalogue_producer = mocker.patch.object(app_module, "catalogue_producer")
+
+    for _ in range(2):
+        app_module.generate_access_policies(b"{}", "ws", s3_client)
+
+    assert catalogue_producer.send_async.call_count == 2
+
+
+def test_get_harvested_metadata_missing_file(app_module, s3_client):
+    assert app_module.get_harvested_metadata(TARGET_BUCKET, "metadata", s3_client) == {}
+
+
+def test_get_harvested_metadata_cache_is_bounded(app_module, s3_client, monkeypatch):
+    monkeypatch.setattr(app_module, "max_cached_metadata", 1)
+    for key in ("metadata-a", "metadata-b"):
+        s3_client.put_object(Bucket=TARGET_BUCKET, Key=key, Body=b"{}")
+        app_module.get_harvested_metadata(TARGET_BUCKET, key, s3_client)
+
+    assert list(app_module.harvested_metadata_cache) == ["metadata-b"]
+
+
+def test_get_harvested_metadata_reuses_unchanged_metadata(app_module, s3_client, mocker):
+    s3_client.put_object(Bucket=TARGET_BUCKET, Key="metadata", Body=b'{"a": "etag"}')
+    metadata = app_module.get_harvested_metadata(TARGET_BUCKET, "metadata", s3_client)
+    get_object = mocker.spy(s3_client, "get_object")
+    head_object = mocker.spy(s3_client, "head_object")
+
+    assert app_module.get_harvested_metadata(TARGET_BUCKET, "metadata", s3_client) is metadata
+    assert get_object.call_args.kwargs["IfNoneMatch"]
+    head_object.assert_not_called()
+
+
+def test_remove_items_from_deleted_collections(app_module, s3_client):
+    items = {
+        "ws/eodh-config/item-1.json": "catalogs/cat/collections/col",
+        "ws/eodh-config/item-2.json": "catalogs/cat/collections/other",
+    }
+    for key, parent in items.items():
+        # json.dumps writes NaN literals, which orjson cannot parse
+        body = json.dumps(
+            {"type": "Feature", "nodata": math.nan, "links": [{"rel": "parent", "href": parent}]}
+        )
+        s3_client.put_object(Bucket=SOURCE_BUCKET, Key=key, Body=body)
+    all_details = app_module.list_files_s3(SOURCE_BUCKET, "ws/eodh-config/", s3_client)
+
+    deleted = app_module.remove_items_from_deleted_collections(
+        ["ws/eodh-config/cat_$_col.json"], all_details, s3_client, SOURCE_BUCKET
+    )
+
+    assert deleted == ["ws/eodh-config/item-1.json"]
+    remaining = s3_client.list_objects_v2(Bucket=SOURCE_BUCKET)["Contents"]
+    assert [details["Key"] for details in remaining] == ["ws/eodh-config/item-2.json"]
+
+
+def test_time_until_next_harvest_without_previous_harvest(app_module, s3_client, monkeypatch):
+    monkeypatch.setattr(app_module, "target_s3_bucket", TARGET_BUCKET)
+
+    assert app_module.time_until_next_harvest("workspace", s3_client) == 0.0
+
+
+def test_time_until_next_harvest_after_harvest(app_module, s3_client, monkeypatch):
+    monkeypatch.setattr(app_module, "target_s3_bucket", TARGET_BUCKET)
+    s3_client.put_object(
+        Bucket=TARGET_BUCKET, Key=app_module.get_last_harvest_s3_key("workspace"), Body=b""
+    )
+
+    assert app_module.time_until_next_harvest("workspace", s3_client) > 0
+
+
+def test_remove_items_from_deleted_collections_ignores_non_collections(
+    app_module, s3_client, mocker
+):
+    get_parent_href = mocker.patch.object(app_module, "get_parent_href")
+
+    deleted = app_module.remove_items_from_deleted_collections(
+        ["ws/eodh-config/catalogue.json"], [{"Key": "ws/eodh-config/item.json"}], s3_client, ""
+    )
+
+    assert deleted == []
+    get_parent_href.assert_not_called()
+
+
+def test_list_files_s3_partitions_large_listings(app_module, s3_client):
+    keys = ["ws/eodh-config/top.json"]
+    keys += [f"ws/eodh-config/{sub}/{i:04}.json" for sub in "ab" for i in range(510)]
+    for key in keys + ["other/eodh-config/c.json"]:
+        s3_client.put_object(Bucket=SOURCE_BUCKET, Key=key, Body=b"{}")
+
+    contents = app_module.list_files_s3(SOURCE_BUCKET, "ws/eodh-config/", s3_client)
+
+    assert sorted(details["Key"] for details in contents) == sorted(keys)
+
+
+def test_rate_limited_response(app_module):
+    response = app_module.rate_limited_response(2.3)
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    assert json.loads(response.body)["code"] == "harvest.rate_limited"
+
+
+def test_record_harvest_attempt_allows_first_harvest(app_module):
+    assert app_module.record_harvest_attempt("workspace") <= 0
+    assert "workspace" in app_module.last_harvest_times
+
+
+def test_record_harvest_attempt_limits_repeat_harvest(app_module):
+    app_module.record_harvest_attempt("workspace")
+
+    retry_after = app_module.record_harvest_attempt("workspace")
+
+    assert 0 < retry_after <= app_module.runtime_frequency_limit
+
+
+def test_record_harvest_attempt_allows_harvest_after_limit(app_module, mocker):
+    limit = app_module.runtime_frequency_limit
+    mocker.patch.object(app_module.time, "monotonic", side_effect=[100.0, 100.0 + limit + 1])
+
+    assert app_module.record_harvest_attempt("workspace") <= 0
+    assert app_module.record_harvest_attempt("workspace") <= 0
+    assert app_module.last_harvest_times["workspace"] == 100.0 + limit + 1
+
+
+def test_record_harvest_attempt_is_per_workspace(app_module):
+    app_module.record_harvest_attempt("workspace-a")
+
+    assert app_module.record_harvest_attempt("workspace-b") <= 0
+
+
+def test_harvested_metadata_is_gzip_compressed(app_module, s3_client):
+    metadata = {"ws/eodh-config/a.json": '"etag"'}
+
+    app_module.upload_harvested_metadata(metadata, TARGET_BUCKET, "metadata", s3_client)
+
+    file_obj = s3_client.get_object(Bucket=TARGET_BUCKET, Key="metadata")
+    assert file_obj["ContentEncoding"] == "gzip"
+    assert orjson.loads(gzip.decompress(file_obj["Body"].read())) == metadata
+    assert app_module.get_harvested_metadata(TARGET_BUCKET, "metadata", s3_client) == metadata
+
+
+def test_get_harvested_metadata_reads_plain_json(app_module, s3_client):
+    metadata = {"ws/eodh-config/a.json": '"etag"'}
+    s3_client.put_object(Bucket=TARGET_BUCKET, Key="metadata", Body=json.dumps(metadata))
+
+    assert app_module.get_harvested_metadata(TARGET_BUCKET, "metadata", s3_client) == metadata
+
+
+@pytest.fixture
+def harvest(app_module, s3_client, mocker):
+    """Run a harvest of the "ws" workspace, returning the messages consumed"""
+    mocker.patch.object(app_module, "get_s3_client", return_value=s3_client)
+    mocker.patch.object(app_module, "get_harvest_producer")
+    consume = mocker.patch.object(app_module, "FileHarvesterMessager").return_value.consume
+
+    def run():
+        consume.reset_mock()
+        app_module.get_workspace_contents("ws", SOURCE_BUCKET, TARGET_BUCKET)
+        return [call.args[0] for call in consume.call_args_list]
+
+    return run
+
+
+def put_workspace_files(s3_client, *names):
+    for name in names:
+        s3_client.put_object(
+            Bucket=SOURCE_BUCKET,
+            Key=f"ws/eodh-config/{name}",
+            Body=json.dumps({"type": "Catalog", "id": name}),
+        )
+
+
+def test_harvest_skips_files_with_unchanged_etag(app_module, s3_client, harvest, mocker):
+    put_workspace_files(s3_client, "a.json", "b.json")
+    harvest()
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key="ws/eodh-config/b.json", Body=b"{}")
+    fetch = mocker.patch.object(
+        app_module, "fetch_workspace_file", wraps=app_module.fetch_workspace_file
+    )
+
+    (msg,) = harvest()
+
+    assert [call.args[0] for call in fetch.call_args_list] == ["ws/eodh-config/b.json"]
+    assert msg["harvested_data"] == {"ws/eodh-config/b.json": b"{}"}
+    assert msg["deleted_keys"] == []
+    metadata = app_module.get_harvested_metadata(
+        TARGET_BUCKET, app_module.get_metadata_s3_key("ws"), s3_client
+    )
+    assert sorted(metadata) == ["ws/eodh-config/a.json", "ws/eodh-config/b.json"]
+
+
+@pytest.mark.parametrize("limit", [("max_entries", 1), ("max_message_bytes", 60)])
+def test_harvest_flushes_full_messages(app_module, s3_client, harvest, monkeypatch, limit):
+    monkeypatch.setattr(app_module, *limit)
+    put_workspace_files(s3_client, "a.json", "b.json", "c.json")
+
+    messages = harvest()
+
+    assert [len(msg["harvested_data"]) for msg in messages] == [2, 1]
+    assert sorted(key for msg in messages for key in msg["harvested_data"]) == [
+        "ws/eodh-config/a.json",
+        "ws/eodh-config/b.json",
+        "ws/eodh-config/c.json",
+    ]
+
+
+def test_harvest_skips_empty_flush(app_module, s3_client, harvest, monkeypatch, mocker):
+    monkeypatch.setattr(app_module, "max_entries", 0)
+    mocker.patch.object(app_module, "generate_access_policies")
+    s3_client.put_object(Bucket=SOURCE_BUCKET, Key="ws/eodh-config/access-policy.json", Body=b"{}")
+
+    (msg,) = harvest()
+
+    assert msg["harvested_data"] == {}
+
+
+def test_harvest_without_changes_only_records_harvest(app_module, s3_client, harvest, mocker):
+    put_workspace_files(s3_client, "a.json")
+    harvest()
+    s3_client.delete_object(Bucket=TARGET_BUCKET, Key=app_module.get_last_harvest_s3_key("ws"))
+    upload_harvested_metadata = mocker.patch.object(app_module, "upload_harvested_metadata")
+
+    assert harvest() == []
+    upload_harvested_metadata.assert_not_called()
+    s3_client.head_object(Bucket=TARGET_BUCKET, Key=app_module.get_last_harvest_s3_key("ws"))
+
+
+def test_harvest_reports_deleted_keys(app_module, s3_client, harvest):
+    put_workspace_files(s3_client, "a.json", "b.json")
+    harvest()
+    metadata_s3_key = app_module.get_metadata_s3_key("ws")
+    previously_harvested = app_module.get_harvested_metadata(
+        TARGET_BUCKET, metadata_s3_key, s3_client
+    )
+    expected = dict(previously_harvested)
+    s3_client.delete_object(Bucket=SOURCE_BUCKET, Key="ws/eodh-config/b.json")
+
+    (msg,) = harvest()
+
+    assert msg["deleted_keys"] == ["ws/eodh-config/b.json"]
+    assert previously_harvested == expected
+    metadata = app_module.get_harvested_metadata(TARGET_BUCKET, metadata_s3_key, s3_client)
+    assert list(metadata) == ["ws/eodh-config/a.json"]
+
+
+def test_harvest_cancels_pending_fetches_on_failure(
+    app_module, s3_client, harvest, monkeypatch, mocker
+):
+    monkeypatch.setattr(app_module, "harvest_workers", 1)
+    put_workspace_files(s3_client, *(f"{i}.json" for i in range(5)))
+
+    def fail(*args):
+        time.sleep(0.05)
+        raise Exception("fetch failed")
+
+    fetch = mocker.patch.object(app_module, "fetch_workspace_file", side_effect=fail)
+
+    assert harvest() == []
+    assert fetch.call_count < 5
+    with pytest.raises(ClientError):
+        s3_client.head_object(Bucket=TARGET_BUCKET, Key=app_module.get_metadata_s3_key("ws"))
+
+
+@pytest.fixture
+def harvest_client(app_module, s3_client, monkeypatch, mocker):
+    """Client for the harvest endpoint, with harvests recorded rather than run"""
+    monkeypatch.setattr(app_module, "target_s3_bucket", TARGET_BUCKET)
+    mocker.patch.object(app_module, "get_s3_client", return_value=s3_client)
+    harvest_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(app_module, "harvest_executor", harvest_executor)
+    get_workspace_contents = mocker.patch.object(app_module, "get_workspace_contents")
+
+    def post(workspace_name):
+        response = TestClient(app_module.app).post(f"/{workspace_name}/harvest")
+        harvest_executor.shutdown(wait=True)
+        return response, get_workspace_contents
+
+    return post
+
+
+def test_harvest_endpoint_starts_harvest(harvest_client):
+    response, get_workspace_contents = harvest_client("ws")
+
+    assert response.status_code == 200
+    get_workspace_contents.assert_called_once()
+
+
+def test_harvest_endpoint_limits_repeat_harvest(app_module, harvest_client):
+    app_module.record_harvest_attempt("ws")
+
+    response, get_workspace_contents = harvest_client("ws")
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    get_workspace_contents.assert_not_called()
+
+
+def test_harvest_endpoint_limits_recently_harvested_workspace(
+    app_module, s3_client, harvest_client
+):
+    s3_client.put_object(
+        Bucket=TARGET_BUCKET, Key=app_module.get_last_harvest_s3_key("ws"), Body=b""
+    )
+
+    response, get_workspace_contents = harvest_client("ws")
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    get_workspace_contents.assert_not_called()
+    assert "ws" not in app_module.last_harvest_times
+
+
+def log_hits(*timestamps):
+    return {
+        "hits": {
+            "hits": [
+                {"_source": {"@timestamp": timestamp, "json": {"message": timestamp}}}
+                for timestamp in timestamps
+            ]
+        }
+    }
+
+
+@pytest.fixture
+def harvest_logs(app_module, monkeypatch, mocker):
+    """Request logs from Elasticsearch indices returning the given search results"""
+    monkeypatch.delenv("DEBUG", raising=False)
+    monkeypatch.setattr(app_module, "log_indices_expiry", -math.inf)
+
+    def post(results):
+        es = mocker.patch.object(app_module, "get_elasticsearch_client").return_value
+        es.indices.get = mocker.AsyncMock(return_value=dict.fromkeys(results, {}))
+
+        async def search(index, **kwargs):
+            if isinstance(results[index], Exception):
+                raise results[index]
+            return results[index]
+
+        es.search = search
+        return TestClient(app_module.app, raise_server_exceptions=False).post("/ws/harvest_logs")
+
+    return post
+
+
+def test_harvest_logs_merges_and_sorts_results(harvest_logs):
+    response = harvest_logs(
+        {"index-a": log_hits("2024-01-03", "2024-01-01"), "index-b": log_hits("2024-01-02")}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "count": 3,
+        "messages": [
+            {"datetime": timestamp, "message": timestamp, "level": None}
+            for timestamp in ("2024-01-01", "2024-01-02", "2024-01-03")
+        ],
+    }
+
+
+def test_harvest_logs_skips_undecodable_results(harvest_logs):
+    response = harvest_logs(
+        {"index-a": log_hits("2024-01-01"), "index-b": SerializationError("invalid JSON")}
+    )
+
+    assert response.json()["count"] == 1
+
+
+def test_harvest_logs_raises_other_errors(harvest_logs):
+    response = harvest_logs(
+        {"index-a": log_hits("2024-01-01"), "index-b": ConnectionError("unavailable")}
+    )
+
+    assert response.status_code == 500
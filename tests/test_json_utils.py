@@ -0,0 +1,22 @@
+import math
+from json import JSONDecodeError
+
+import pytest
+from json_utils import loads_json
+
+
+def test_loads_json_parses_bytes():
+    assert loads_json(b'{"id": "item"}') == {"id": "item"}
+
+
+def test_loads_json_accepts_nan_and_infinity():
+    data = loads_json(b'{"nodata": NaN, "max": Infinity}')
+
+    assert math.isnan(data["nodata"])
+    assert data["max"] == math.inf
+
+
+@pytest.mark.parametrize("raw_data", [b'{"id": ', b"\xff\xfe"])
+def test_loads_json_rejects_invalid_json(raw_data):
+    with pytest.raises(JSONDecodeError):
+        loads_json(raw_data)
@@ -0,0 +1,48 @@
+from unittest import mock
+
+import pytest
+from messager import FileHarvesterMessager
+
+from tests.helpers import TARGET_BUCKET
+
+
+@pytest.fixture
+def messager():
+    return FileHarvesterMessager(
+        workspace_name="ws",
+        s3_client=mock.MagicMock(),
+        output_bucket=TARGET_BUCKET,
+        cat_output_prefix="transformed/",
+        producer=mock.MagicMock(),
+    )
+
+
+def test_process_msg_passes_body_through_unchanged(messager):
+    body = (
+        b'{"type": "Feature", "id": "item", "nodata": NaN,'
+        b' "links": [{"rel": "parent", "href": "catalogs/cat/collections/col.json"}]}'
+    )
+
+    (action,) = messager.process_msg(
+        {"harvested_data": {"ws/eodh-config/item.json": body}, "deleted_keys": []}
+    )
+
+    assert action.file_body == body.decode()
+    assert action.cat_path == "catalogs/cat/collections/col/items/item.json"
+
+
+def test_process_msg_skips_invalid_json(messager):
+    actions = messager.process_msg(
+        {
+            "harvested_data": {
+                "ws/eodh-config/invalid.json": b'{"type": ',
+                "ws/eodh-config/catalog.json": b'{"type": "Catalog", "id": "cat"}',
+            },
+            "deleted_keys": ["ws/eodh-config/deleted.json"],
+        }
+    )
+
+    assert [(action.file_body, action.cat_path) for action in actions] == [
+        ('{"type": "Catalog", "id": "cat"}', "cat.json"),
+        (None, "ws/eodh-config/deleted.json"),
+    ]
@@ -1,19 +1,31 @@
 import asyncio
+import collections
 import concurrent
+import contextlib
+import contextvars
 import datetime
+import gzip
+import hashlib
 import json
 import logging
+import math
 import os
+import threading
+import time
 import traceback
 import uuid
 from json import JSONDecodeError
 
 import boto3
+import orjson
+import pulsar
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch, SerializationError
 from eodhp_utils.aws.s3 import delete_file_s3, upload_file_s3
 from eodhp_utils.runner import get_boto3_session, get_pulsar_client, setup_logging
 from fastapi import FastAPI
+from json_utils import loads_json
 from messager import FileHarvesterMessager
 from opentelemetry import trace
 from opentelemetry.baggage import set_baggage
@@ -28,7 +40,26 @@ setup_logging(verbosity=2, enable_otel_logging=True)
 root_path = os.environ.get("ROOT_PATH", "/")
 logging.basicConfig(level=logging.DEBUG)
 logging.info("Starting FastAPI")
-app = FastAPI(root_path=root_path)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+
+    # let running harvests finish sending before their producers are closed
+    await asyncio.to_thread(harvest_executor.shutdown, wait=True)
+
+    if shared_es_client is not None:
+        await shared_es_client.close()
+
+    for producer in harvest_producers.values():
+        producer.close()
+    catalogue_producer.flush()
+    catalogue_producer.close()
+    pulsar_client.close()
+
+
+app = FastAPI(root_path=root_path, lifespan=lifespan)
 
 source_s3_bucket = os.environ.get("SOURCE_S3_BUCKET")
 target_s3_bucket = os.environ.get("TARGET_S3_BUCKET")
@@ -41,44 +72,159 @@ env_name = os.environ.get("ENV_NAME")
 env_tag = f"-{env_name}" if env_name else ""
 
 minimum_message_entries = int(os.environ.get("MINIMUM_MESSAGE_ENTRIES", 100))
+max_entries = int(os.environ.get("MAX_ENTRIES", 1000))
+runtime_frequency_limit = int(os.environ.get("RUNTIME_FREQUENCY_LIMIT", 10))
+bulk_queue_minimum = int(os.environ.get("BULK_QUEUE_MINIMUM", 100))
+eodh_config_dir = os.environ.get("EODH_CONFIG_DIR", "eodh-config")
+pulsar_topic = os.environ.get("PULSAR_TOPIC")
+pulsar_topic_bulk = os.environ.get("PULSAR_TOPIC_BULK")
 max_log_messages = int(os.environ.get("MAX_LOG_MESSAGES", 100))
+max_message_bytes = int(os.environ.get("MAX_MESSAGE_BYTES", 4 * 1024 * 1024))
+harvest_workers = int(os.environ.get("HARVEST_WORKERS", 32))
+max_concurrent_harvests = int(os.environ.get("MAX_CONCURRENT_HARVESTS", 4))
+max_cached_metadata = int(os.environ.get("MAX_CACHED_METADATA", 32))
 
 SECONDS_IN_HOUR = 60 * 60
 SECONDS_IN_DAY = 24 * SECONDS_IN_HOUR
 
-block_object_store_data_access_control_s3_bucket = os.environ.get(
-    "BLOCK_OBJECT_STORE_DATA_ACCESS_CONTROL_S3_BUCKET"
-)
-catalogue_data_access_control_s3_bucket = os.environ.get("CATALOGUE_DATA_ACCESS_CONTROL_S3_BUCKET")
-workflow_access_control_s3_bucket = os.environ.get("WORKFLOW_DATA_ACCESS_CONTROL_S3_BUCKET")
-env_name = os.environ.get("ENV_NAME")
-env_tag = f"-{env_name}" if env_name else ""
+LOG_INDICES_TTL = 60
+GZIP_MAGIC_NUMBER = b"\x1f\x8b"
 
 object_store_names = {"object-store": f"workspaces{env_tag}"}
 block_store_names = {"block-store": "workspaces"}
 
+harvested_metadata_cache = collections.OrderedDict()
+harvested_metadata_cache_lock = threading.Lock()
+
+s3_client_lock = threading.Lock()
+shared_s3_client = None
+
+last_harvest_times = {}
+last_harvest_times_lock = threading.Lock()
+
+harvest_executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrent_harvests)
+
+shared_es_client = None
+log_indices = []
+log_indices_expiry = 0.0
+
 pulsar_client = get_pulsar_client()
 catalogue_producer = pulsar_client.create_producer(
     topic=os.environ.get("PULSAR_TOPIC", "harvested"),
-    producer_name=f"workspace_file_harvester/catalogues_{uuid.uuid1().hex}",
+    producer_name=f"workspace_file_harvester/catalogues_{uuid.uuid4().hex}",
     chunking_enabled=True,
 )
 
+harvest_producers = {}
+harvest_producers_lock = threading.Lock()
+
+
+def get_harvest_producer(topic: str, tag: str):
+    """Returns the Pulsar producer shared by harvests sending to a topic, creating it on first use"""
+    with harvest_producers_lock:
+        if topic not in harvest_producers:
+            harvest_producers[topic] = pulsar_client.create_producer(
+                topic=topic,
+                producer_name=f"workspace_file_harvester/{tag}_{uuid.uuid4().hex}",
+                chunking_enabled=True,
+            )
+        return harvest_producers[topic]
+
+
+def get_s3_client() -> boto3.client:
+    """Returns the S3 client shared by all harvests, creating it on first use"""
+    global shared_s3_client
+
+    with s3_client_lock:
+        if shared_s3_client is None:
+            shared_s3_client = get_boto3_session().client(
+                "s3",
+                config=Config(
+                    # enough connections for every concurrent harvest's workers
+                    max_pool_connections=max_concurrent_harvests * harvest_workers,
+                    retries={"mode": "adaptive", "max_attempts": 5},
+                    tcp_keepalive=True,
+                ),
+            )
+
+    return shared_s3_client
+
+
+def get_elasticsearch_client() -> AsyncElasticsearch:
+    """Returns the Elasticsearch client shared by all requests, creating it on first use"""
+    global shared_es_client
+
+    if shared_es_client is None:
+        shared_es_client = AsyncElasticsearch(
+            os.environ["ELASTICSEARCH_URL"],
+            verify_certs=False,
+            api_key=os.environ["API_KEY"],
+            connections_per_node=50,
+            http_compress=True,
+            request_timeout=30,
+        )
+
+    return shared_es_client
+
+
+async def get_log_indices(es: AsyncElasticsearch) -> list:
+    """Returns the log indices to search, refreshing the cached list once it has expired"""
+    global log_indices, log_indices_expiry
+
+    if time.monotonic() >= log_indices_expiry:
+        log_indices = list(await es.indices.get(index=".ds-logs-generic-default-*"))
+        log_indices_expiry = time.monotonic() + LOG_INDICES_TTL
+
+    return log_indices
+
+
+def time_until_next_local_harvest(workspace_name: str) -> float:
+    """Returns the seconds to wait before this process can harvest a workspace again"""
+    with last_harvest_times_lock:
+        last_harvest_time = last_harvest_times.get(workspace_name, -math.inf)
+
+    return last_harvest_time + runtime_frequency_limit - time.monotonic()
+
+
+def record_harvest_attempt(workspace_name: str) -> float:
+    """Records a workspace harvest, returning the seconds to wait if this process ran one too recently"""
+    now = time.monotonic()
+    with last_harvest_times_lock:
+        last_harvest_time = last_harvest_times.get(workspace_name, -math.inf)
+        retry_after = last_harvest_time + runtime_frequency_limit - now
+        if retry_after <= 0:
+            last_harvest_times[workspace_name] = now
+
+    return retry_after
+
+
+def rate_limited_response(retry_after: float) -> JSONResponse:
+    """Generates a response telling the caller how long to wait before harvesting again"""
+    retry_after = math.ceil(retry_after)
+    return JSONResponse(
+        content={
+            "code": "harvest.rate_limited",
+            "message": f"Wait {retry_after} seconds before trying again",
+        },
+        status_code=429,
+        headers={"Retry-After": str(retry_after)},
+    )
+
 
 def generate_store_policies(data: json, map: dict) -> dict:
     """Generates policies for a give block/object store"""
-    buckets = {}
-    for store, values in data.items():
-        policies = []
-        for path, access in values.items():
-            policies.append({"path": path, "access": access["access"]})
+    for store in data.keys() - map.keys():
+        logging.warning(f"Name {store} not valid")
 
-        if store_name := map.get(store):
-            buckets[store_name] = {"accessControl": policies}
-        else:
-            logging.warning(f"Name {store} not valid")
-
-    return buckets
+    return {
+        store_name: {
+            "accessControl": [
+                {"path": path, "access": access["access"]} for path, access in values.items()
+            ]
+        }
+        for store, values in data.items()
+        if (store_name := map.get(store))
+    }
 
 
 def generate_block_object_store_policy(block_data: dict, object_data: dict) -> dict:
@@ -125,16 +271,21 @@ def generate_workflow_policy(data: dict) -> list:
     return workflows
 
 
-def create_access_policies(raw_data: str, workspace_name: str) -> tuple:
+def create_access_policies(raw_data: bytes, workspace_name: str) -> tuple:
     """Generates access policies for block/object store data, user catalogues and workflows"""
     try:
-        data = json.loads(raw_data)
-    except json.decoder.JSONDecodeError as e:
+        data = loads_json(raw_data)
+    except JSONDecodeError as e:
         logging.error(f"Data is in incorrect format. Must be JSON: {raw_data}")
         raise e
 
-    raw_block_store_data = {key: value for key, value in data.items() if "block-store" in key}
-    raw_object_store_data = {key: value for key, value in data.items() if "object-store" in key}
+    raw_block_store_data = {}
+    raw_object_store_data = {}
+    for key, value in data.items():
+        if key.startswith("block-store"):
+            raw_block_store_data[key] = value
+        elif key.startswith("object-store"):
+            raw_object_store_data[key] = value
     raw_catalogues_data = data.get("catalogue", {})
     raw_workflows_data = data.get("workflows", {})
 
@@ -147,7 +298,30 @@ def create_access_policies(raw_data: str, workspace_name: str) -> tuple:
     return formatted_block_object_store_data, formatted_catalogues_data, formatted_workflows_data
 
 
-def generate_access_policies(file_data, workspace_name, s3_client):
+def upload_policy_s3(body: bytes, bucket: str, key: str, s3_client: boto3.client):
+    """Upload an access policy to S3 unless the stored copy is identical"""
+    # a single-part upload's ETag is the MD5 of its body
+    body_etag = f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+    try:
+        if s3_client.head_object(Bucket=bucket, Key=key)["ETag"] == body_etag:
+            logging.info(f"{key} in {bucket} is unchanged - skipping upload")
+            return
+    except ClientError as e:
+        logging.warning(f"Unable to check {key} in {bucket} - uploading anyway: {e}")
+
+    upload_file_s3(body, bucket, key, s3_client)
+    logging.info(f"Uploaded {key} to {bucket}")
+
+
+def log_pulsar_send_result(result: pulsar.Result, workspace_name: str):
+    """Log the outcome of an asynchronous Pulsar send"""
+    if result == pulsar.Result.Ok:
+        logging.info(f"Pulsar message sent for {workspace_name}")
+    else:
+        logging.error(f"Failed to send Pulsar message for {workspace_name}: {result}")
+
+
+def generate_access_policies(file_data: bytes, workspace_name: str, s3_client: boto3.client):
     logging.info(f"Access policies found for {workspace_name}")
     block_object_store_key = f"{workspace_name}-access_policy.json"
     catalogue_key = f"{workspace_name}/{workspace_name}-meta_access_policy.json"
@@ -157,178 +331,265 @@ def generate_access_policies(file_data, workspace_name, s3_client):
         create_access_policies(file_data, workspace_name)
     )
 
-    upload_file_s3(
-        json.dumps(block_store_access_policies),
-        block_object_store_data_access_control_s3_bucket,
-        block_object_store_key,
-        s3_client,
-    )
-    logging.info(
-        f"Uploaded {block_object_store_key} to {block_object_store_data_access_control_s3_bucket}"
-    )
-    upload_file_s3(
-        json.dumps(catalogue_access_policies),
-        catalogue_data_access_control_s3_bucket,
-        catalogue_key,
-        s3_client,
-    )
-    logging.info(f"Uploaded {catalogue_key} to {catalogue_data_access_control_s3_bucket}")
-    upload_file_s3(
-        json.dumps(catalogue_access_policies),
-        catalogue_data_access_control_s3_bucket,
-        catalogue_key_harvested,
-        s3_client,
-    )
-    logging.info(f"Uploaded {catalogue_key_harvested} to {catalogue_data_access_control_s3_bucket}")
-
+    catalogue_access_policies_body = orjson.dumps(catalogue_access_policies)
+    uploads = [
+        (
+            orjson.dumps(block_store_access_policies),
+            block_object_store_data_access_control_s3_bucket,
+            block_object_store_key,
+        ),
+        (catalogue_access_policies_body, catalogue_data_access_control_s3_bucket, catalogue_key),
+        (
+            catalogue_access_policies_body,
+            catalogue_data_access_control_s3_bucket,
+            catalogue_key_harvested,
+        ),
+    ]
     for workflow_policy in workflow_access_policies:
         workflow_key = f"deployed/{workspace_name}/{workflow_policy['name']}.access_policy.json"
-        upload_file_s3(
-            json.dumps(workflow_policy["policy"]),
-            workflow_access_control_s3_bucket,
-            workflow_key,
-            s3_client,
+        uploads.append(
+            (
+                orjson.dumps(workflow_policy["policy"]),
+                workflow_access_control_s3_bucket,
+                workflow_key,
+            )
         )
-        logging.info(f"Uploaded {workflow_key} to {workflow_access_control_s3_bucket}")
 
-    catalogue_producer.send(
-        (
-            json.dumps(
-                {
-                    "id": f"harvester/workspace_file_harvester/{workspace_name}/workspaces",
-                    "workspace": workspace_name,
-                    "repository": "",
-                    "branch": "",
-                    "bucket_name": catalogue_data_access_control_s3_bucket,
-                    "source": "",
-                    "target": "",
-                    "added_keys": [catalogue_key_harvested],
-                    "updated_keys": [],
-                    "deleted_keys": [],
-                }
-            )
-        ).encode("utf-8")
+    # the policies are independent, so upload them concurrently
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(len(uploads), harvest_workers)
+    ) as executor:
+        futures = [
+            executor.submit(upload_policy_s3, body, bucket, key, s3_client)
+            for body, bucket, key in uploads
+        ]
+        for future in futures:
+            future.result()
+
+    catalogue_producer.send_async(
+        orjson.dumps(
+            {
+                "id": f"harvester/workspace_file_harvester/{workspace_name}/workspaces",
+                "workspace": workspace_name,
+                "repository": "",
+                "branch": "",
+                "bucket_name": catalogue_data_access_control_s3_bucket,
+                "source": "",
+                "target": "",
+                "added_keys": [catalogue_key_harvested],
+                "updated_keys": [],
+                "deleted_keys": [],
+            }
+        ),
+        lambda result, _: log_pulsar_send_result(result, workspace_name),
     )
-    logging.info("Pulsar message sent")
 
 
-def get_file_s3(bucket: str, key: str, s3_client: boto3.client) -> tuple:
-    """Retrieve data from an S3 bucket"""
+def get_file_s3(bucket: str, key: str, s3_client: boto3.client, if_none_match: str = None) -> tuple:
+    """Retrieve data from an S3 bucket, returning no data if its ETag matches if_none_match"""
+    conditions = {"IfNoneMatch": if_none_match} if if_none_match else {}
     try:
-        file_obj = s3_client.get_object(Bucket=bucket, Key=key)
-        last_modified = datetime.datetime.strptime(
-            file_obj["ResponseMetadata"]["HTTPHeaders"]["last-modified"], "%a, %d %b %Y %H:%M:%S %Z"
-        )
-        file_contents = file_obj["Body"].read().decode("utf-8")
-        return file_contents, last_modified
+        file_obj = s3_client.get_object(Bucket=bucket, Key=key, **conditions)
     except ClientError as e:
+        if e.response["ResponseMetadata"]["HTTPStatusCode"] == 304:
+            return None, if_none_match
         logging.warning(f"File retrieval failed for {key}: {e}")
-        return "{}", datetime.datetime(1970, 1, 1)
+        return b"{}", None
+
+    return file_obj["Body"].read(), file_obj["ETag"]
+
+
+def get_harvested_metadata(bucket: str, key: str, s3_client: boto3.client) -> dict:
+    """Retrieve previously harvested metadata, returning the cached read-only dict if unchanged"""
+    with harvested_metadata_cache_lock:
+        cached_etag, cached_metadata = harvested_metadata_cache.get(key, (None, None))
+        if cached_etag:
+            harvested_metadata_cache.move_to_end(key)
+    raw_data, etag = get_file_s3(bucket, key, s3_client, if_none_match=cached_etag)
+
+    if raw_data is None:
+        logging.info(f"{key} is unchanged - using cached metadata")
+        return cached_metadata
+
+    if raw_data[:2] == GZIP_MAGIC_NUMBER:
+        raw_data = gzip.decompress(raw_data)
+
+    metadata = orjson.loads(raw_data)
+    if etag and max_cached_metadata > 0:
+        with harvested_metadata_cache_lock:
+            harvested_metadata_cache[key] = (etag, metadata)
+            harvested_metadata_cache.move_to_end(key)
+            # evict the least recently harvested workspaces
+            while len(harvested_metadata_cache) > max_cached_metadata:
+                harvested_metadata_cache.popitem(last=False)
+
+    return metadata
+
+
+def upload_harvested_metadata(metadata: dict, bucket: str, key: str, s3_client: boto3.client):
+    """Upload harvested metadata to an S3 bucket as gzip-compressed JSON"""
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=gzip.compress(orjson.dumps(metadata), compresslevel=1),
+        ContentEncoding="gzip",
+        ContentType="application/json",
+    )
+    logging.info(f"Uploaded {key} to {bucket}")
+
+
+def list_files_s3(bucket: str, prefix: str, s3_client: boto3.client) -> list:
+    """List all objects under a prefix, listing each of its sub-prefixes concurrently"""
+    first_page = s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix)
+    if not first_page.get("IsTruncated"):
+        # everything fits in a single page, so there is nothing to gain from partitioning
+        return first_page.get("Contents", [])
+
+    contents = []
+    sub_prefixes = []
+    paginator = s3_client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+        contents.extend(page.get("Contents", []))
+        sub_prefixes.extend(
+            common_prefix["Prefix"] for common_prefix in page.get("CommonPrefixes", [])
+        )
+
+    def list_sub_prefix(sub_prefix: str) -> list:
+        sub_paginator = s3_client.get_paginator("list_objects_v2")
+        return [
+            details
+            for page in sub_paginator.paginate(Bucket=bucket, Prefix=sub_prefix)
+            for details in page.get("Contents", [])
+        ]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=harvest_workers) as executor:
+        for sub_prefix_contents in executor.map(list_sub_prefix, sub_prefixes):
+            contents.extend(sub_prefix_contents)
+
+    return contents
+
+
+def fetch_workspace_file(key: str, bucket: str, s3_client: boto3.client) -> tuple:
+    """Retrieve a workspace file and its ETag from S3"""
+    try:
+        file_obj = s3_client.get_object(Bucket=bucket, Key=key)
+        return key, file_obj["ETag"], file_obj["Body"].read()
+    except ClientError as e:
+        raise Exception from e
+
+
+def get_parent_href(key: str, bucket: str, s3_client: boto3.client) -> str:
+    """Retrieve the parent link of a STAC file from an S3 bucket"""
+    try:
+        file_obj = s3_client.get_object(Bucket=bucket, Key=key)
+
+        file_data = loads_json(file_obj["Body"].read())
+
+    except ClientError as e:
+        if not e.response["ResponseMetadata"]["HTTPStatusCode"] == 304:
+            raise Exception from e
+        return None
+
+    except JSONDecodeError:  # ignore non-JSON files
+        logging.warning(f"{key} is not valid JSON. Passing...")
+        return None
+
+    links = file_data.get("links", [])
+    return next((link.get("href") for link in links if link.get("rel") == "parent"), None)
 
 
 def remove_items_from_deleted_collections(
     deleted_keys: list, all_details: list, s3_client, bucket: str
 ):
     """Remove items if collection is deleted"""
+    deleted_collections = {}
+    for deleted_key in deleted_keys:
+        deleted_name = deleted_key.rsplit("/", 1)[-1].removesuffix(".json")
+        try:
+            catalogue, collection = deleted_name.split("_$_")
+            deleted_collections[f"catalogs/{catalogue}/collections/{collection}"] = (
+                catalogue,
+                collection,
+            )
+        except ValueError:  # not a collection
+            pass
+
+    if not deleted_collections:
+        return []
+
+    keys = [details["Key"] for details in all_details if not details["Key"].endswith("/")]
+
     additional_deleted_keys = []
-    for details in all_details:
-        key = details["Key"]
-        if not key.endswith("/"):
-            logging.info(f"{key} found")
-
-            try:
-                file_obj = s3_client.get_object(Bucket=source_s3_bucket, Key=key)
-
-                file_data = json.loads(file_obj["Body"].read().decode("utf-8"))
-
-                for deleted_key in deleted_keys:
-                    deleted_key = deleted_key.split("/")[-1].rstrip(".json")
-                    try:
-                        catalogue, collection = deleted_key.split("_$_")
-                        links = file_data.get("links", [])
-                        for link in links:
-                            if link.get("rel") == "parent":
-                                parent_path = link.get("href")
-                                if parent_path == f"catalogs/{catalogue}/collections/{collection}":
-                                    logging.info(
-                                        f"Parent collection {collection} in {catalogue} deleted - "
-                                        f"deleting {key}"
-                                    )
-                                    delete_file_s3(bucket, key, s3_client)
-                                    additional_deleted_keys.append(key)
-                                break
-                    except ValueError:  # not a collection
-                        pass
-
-            except ClientError as e:
-                if not e.response["ResponseMetadata"]["HTTPStatusCode"] == 304:
-                    raise Exception from e
-
-            except JSONDecodeError:  # ignore non-JSON files
-                logging.warning(f"{key} is not valid JSON. Passing...")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=harvest_workers) as executor:
+        parent_hrefs = executor.map(lambda key: get_parent_href(key, bucket, s3_client), keys)
+        for key, parent_href in zip(keys, parent_hrefs, strict=True):
+            if parent_href in deleted_collections:
+                catalogue, collection = deleted_collections[parent_href]
+                logging.info(
+                    f"Parent collection {collection} in {catalogue} deleted - deleting {key}"
+                )
+                delete_file_s3(bucket, key, s3_client)
+                additional_deleted_keys.append(key)
 
     return additional_deleted_keys
 
 
-async def get_workspace_contents(workspace_name: str, source_s3_bucket: str, target_s3_bucket: str):
+def get_metadata_s3_key(workspace_name: str) -> str:
+    """Returns the S3 key of a workspace's harvested metadata"""
+    return f"harvested-metadata/file-harvester/{workspace_name}"
+
+
+def get_last_harvest_s3_key(workspace_name: str) -> str:
+    """Returns the S3 key of the marker written whenever a workspace harvest completes"""
+    return f"harvested-metadata/file-harvester-last-harvest/{workspace_name}"
+
+
+def time_until_next_harvest(workspace_name: str, s3_client: boto3.client) -> float:
+    """Returns the seconds until a workspace may be harvested again, based on its last harvest"""
+    last_harvest_s3_key = get_last_harvest_s3_key(workspace_name)
+    try:
+        file_head = s3_client.head_object(Bucket=target_s3_bucket, Key=last_harvest_s3_key)
+    except ClientError as e:
+        logging.warning(f"File retrieval failed for {last_harvest_s3_key}: {e}")
+        return 0.0
+
+    file_age = datetime.datetime.now(datetime.timezone.utc) - file_head["LastModified"]
+    return (datetime.timedelta(seconds=runtime_frequency_limit) - file_age).total_seconds()
+
+
+def get_workspace_contents(workspace_name: str, source_s3_bucket: str, target_s3_bucket: str):
     """Run file harvesting for user's workspace"""
-    s3_client = get_boto3_session().client("s3")
+    s3_client = get_s3_client()
 
     # Set OpenTelemetry Baggage (persists across logs and child spans)
     set_baggage("workspace", workspace_name)
 
     with tracer.start_as_current_span("stac_harvester.run"):
         try:
-            max_entries = int(os.environ.get("MAX_ENTRIES", "1000"))
-
             harvested_data = {}
             latest_harvested = {}
 
             logging.info(f"Harvesting from {workspace_name} {source_s3_bucket}")
 
-            pulsar_client = get_pulsar_client()
-
-            metadata_s3_key = f"harvested-metadata/file-harvester/{workspace_name}"
-            harvested_raw_data, last_modified = get_file_s3(
+            metadata_s3_key = get_metadata_s3_key(workspace_name)
+            previously_harvested = get_harvested_metadata(
                 target_s3_bucket, metadata_s3_key, s3_client
             )
-            previously_harvested = json.loads(harvested_raw_data)
-            file_age = datetime.datetime.now() - last_modified
-            time_until_next_attempt = (
-                datetime.timedelta(seconds=int(os.environ.get("RUNTIME_FREQUENCY_LIMIT", "10")))
-                - file_age
-            )
-            if time_until_next_attempt.total_seconds() >= 0:
-                logging.error(
-                    f"Harvest not completed - previous harvest was {file_age} seconds ago"
-                )
-                return JSONResponse(
-                    content={
-                        "message": f"Wait {time_until_next_attempt} seconds before trying again"
-                    },
-                    status_code=429,
-                )
-            logging.info(f"Previously harvested URLs: {previously_harvested}")
+            logging.debug("Previously harvested URLs: %s", previously_harvested)
 
-            all_details = s3_client.list_objects(
-                Bucket=source_s3_bucket,
-                Prefix=f"{workspace_name}/" f'{os.environ.get("EODH_CONFIG_DIR", "eodh-config")}/',
-            ).get("Contents", [])
+            prefix = f"{workspace_name}/{eodh_config_dir}/"
+            all_details = list_files_s3(source_s3_bucket, prefix, s3_client)
 
-            if len(all_details) > int(os.environ.get("BULK_QUEUE_MINIMUM", 100)):
-                topic = os.environ.get("PULSAR_TOPIC_BULK")
+            if len(all_details) > bulk_queue_minimum:
+                topic = pulsar_topic_bulk
                 tag = "bulk"
             else:
-                topic = os.environ.get("PULSAR_TOPIC")
+                topic = pulsar_topic
                 tag = "standard"
 
             logging.info(f"{len(all_details)} files found - using {tag} queue...")
 
-            producer = pulsar_client.create_producer(
-                topic=topic,
-                producer_name=f"workspace_file_harvester/{workspace_name}_{uuid.uuid1().hex}",
-                chunking_enabled=True,
-            )
+            producer = get_harvest_producer(topic, tag)
 
             file_harvester_messager = FileHarvesterMessager(
                 workspace_name=workspace_name,
@@ -339,51 +600,63 @@ async def get_workspace_contents(workspace_name: str, source_s3_bucket: str, tar
             )
 
             count = 0
-            for details in all_details:
-                key = details["Key"]
-                if not key.endswith("/"):
-                    logging.info(f"{key} found")
-
-                    previous_etag = previously_harvested.pop(key, "")
-                    try:
-                        file_obj = s3_client.get_object(
-                            Bucket=source_s3_bucket, Key=key, IfNoneMatch=previous_etag
-                        )
-                        if file_obj["ResponseMetadata"]["HTTPStatusCode"] != 304:
-                            latest_harvested[key] = file_obj["ETag"]
-
-                            try:
-                                file_data = file_obj["Body"].read().decode("utf-8")
-
-                                if key.endswith("/access-policy.json"):
-                                    # don't send this one in the pulsar message - it's not STAC-compliant
-                                    generate_access_policies(file_data, workspace_name, s3_client)
-                                else:
-                                    harvested_data[key] = file_data
-                            except JSONDecodeError:  # ignore non-JSON files
-                                logging.warning(f"{key} is not valid JSON. Passing...")
-                        else:
-                            latest_harvested[key] = previous_etag
-                    except ClientError as e:
-                        if e.response["ResponseMetadata"]["HTTPStatusCode"] == 304:
+            message_bytes = 0
+            changed = False
+            with concurrent.futures.ThreadPoolExecutor(max_workers=harvest_workers) as executor:
+                fut = []
+                for details in all_details:
+                    key = details["Key"]
+                    if not key.endswith("/"):
+                        logging.debug("%s found", key)
+
+                        previous_etag = previously_harvested.get(key, "")
+                        if details.get("ETag") == previous_etag:
+                            # the listing shows the file is unchanged, so there's no need to fetch it
                             latest_harvested[key] = previous_etag
-                        else:
-                            raise Exception from e
-
-                    if count > max_entries:
-                        upload_file_s3(
-                            json.dumps(latest_harvested),
-                            target_s3_bucket,
-                            metadata_s3_key,
-                            s3_client,
+                            continue
+
+                        fut.append(
+                            executor.submit(
+                                fetch_workspace_file,
+                                key,
+                                source_s3_bucket,
+                                s3_client,
+                            )
                         )
-                        msg = {"harvested_data": harvested_data, "deleted_keys": []}
-                        file_harvester_messager.consume(msg)
-                        logging.info(f"Message sent: {msg}")
-                        count = 0
-                        harvested_data = {}
 
-            deleted_keys = list(previously_harvested.keys())
+                try:
+                    for r in concurrent.futures.as_completed(fut):
+                        key, etag, file_data = r.result()
+                        latest_harvested[key] = etag
+                        changed = True
+
+                        try:
+                            if key.endswith("/access-policy.json"):
+                                # don't send this one in the pulsar message - not STAC-compliant
+                                generate_access_policies(file_data, workspace_name, s3_client)
+                            else:
+                                harvested_data[key] = file_data
+                                message_bytes += len(file_data)
+                        except JSONDecodeError:  # ignore non-JSON files
+                            logging.warning(f"{key} is not valid JSON. Passing...")
+
+                        count += 1
+                        if count > max_entries or message_bytes >= max_message_bytes:
+                            if harvested_data:
+                                msg = {"harvested_data": harvested_data, "deleted_keys": []}
+                                file_harvester_messager.consume(msg)
+                                logging.info(
+                                    f"Message sent with {len(harvested_data)} harvested files"
+                                )
+                            count = 0
+                            message_bytes = 0
+                            harvested_data = {}
+                except Exception:
+                    # don't wait for the remaining fetches once the harvest has failed
+                    executor.shutdown(cancel_futures=True)
+                    raise
+
+            deleted_keys = [key for key in previously_harvested if key not in latest_harvested]
             logging.info(f"Deleted keys found: {deleted_keys}")
             additional_deleted_keys = remove_items_from_deleted_collections(
                 deleted_keys, all_details, s3_client, source_s3_bucket
@@ -393,17 +666,29 @@ async def get_workspace_contents(workspace_name: str, source_s3_bucket: str, tar
                 latest_harvested.pop(key)
                 deleted_keys.append(key)
 
-            upload_file_s3(
-                json.dumps(latest_harvested), target_s3_bucket, metadata_s3_key, s3_client
+            if changed or deleted_keys:
+                upload_harvested_metadata(
+                    latest_harvested, target_s3_bucket, metadata_s3_key, s3_client
+                )
+                msg = {
+                    "harvested_data": harvested_data,
+                    "deleted_keys": deleted_keys,
+                    "workspace": workspace_name,
+                }
+                file_harvester_messager.consume(msg)
+
+                logging.info(
+                    f"Message sent with {len(harvested_data)} harvested files "
+                    f"and {len(deleted_keys)} deleted keys"
+                )
+            else:
+                logging.info(f"No changes found for {workspace_name}")
+
+            # the metadata is only rewritten on change, so record every harvest for rate limiting
+            s3_client.put_object(
+                Bucket=target_s3_bucket, Key=get_last_harvest_s3_key(workspace_name), Body=b""
             )
-            msg = {
-                "harvested_data": harvested_data,
-                "deleted_keys": deleted_keys,
-                "workspace": workspace_name,
-            }
-            file_harvester_messager.consume(msg)
 
-            logging.info(f"Message sent: {msg}")
             logging.info("Complete")
 
         except Exception:
@@ -416,9 +701,32 @@ async def harvest(workspace_name: str):
 
     try:
         with tracer.start_as_current_span(workspace_name):
+            retry_after = time_until_next_local_harvest(workspace_name)
+            if retry_after <= 0:
+                retry_after = await asyncio.to_thread(
+                    lambda: time_until_next_harvest(workspace_name, get_s3_client())
+                )
+            if retry_after <= 0:
+                # only record the attempt once both checks pass, so a rejected request doesn't
+                # push back the next harvest
+                retry_after = record_harvest_attempt(workspace_name)
+            if retry_after > 0:
+                logging.error(
+                    f"Harvest not completed - {workspace_name} was harvested less than "
+                    f"{runtime_frequency_limit} seconds ago"
+                )
+                return rate_limited_response(retry_after)
+
             logging.info(f"Starting file harvest for {workspace_name}")
-            asyncio.create_task(
-                get_workspace_contents(workspace_name, source_s3_bucket, target_s3_bucket)
+            # harvesting blocks on S3 and Pulsar, so run it off the event loop
+            context = contextvars.copy_context()
+            asyncio.get_running_loop().run_in_executor(
+                harvest_executor,
+                context.run,
+                get_workspace_contents,
+                workspace_name,
+                source_s3_bucket,
+                target_s3_bucket,
             )
             logging.info("Complete")
 
@@ -432,9 +740,7 @@ async def harvest(workspace_name: str):
 @app.post("/{workspace_name}/harvest_logs")
 async def harvest_logs(workspace_name: str, age: int = SECONDS_IN_DAY):
 
-    es = Elasticsearch(
-        os.environ["ELASTICSEARCH_URL"], verify_certs=False, api_key=os.environ["API_KEY"]
-    )
+    es = get_elasticsearch_client()
     logging.info(f"Checking logs for {workspace_name}")
 
     query = {
@@ -450,46 +756,38 @@ async def harvest_logs(workspace_name: str, age: int = SECONDS_IN_DAY):
 
     sort = [{"@timestamp": {"order": "desc"}}]
 
-    relevant_messages = []
+    indices = await get_log_indices(es)
     if os.environ.get("DEBUG"):
         # Runs code non-currently
-        for index in es.indices.get(index=".ds-logs-generic-default-*"):
+        results = []
+        for index in indices:
             logging.info(f"Found: {index}")
-
-            results = es.search(index=index, scroll="1d", query=query, size=100, sort=sort)
-
-            messages = results["hits"]["hits"]
-            for message in messages:
-                source = message["_source"]
-                m = {
-                    "datetime": source["@timestamp"],
-                    "message": source["json"]["message"],
-                    "level": source["json"].get("level"),
-                }
-                relevant_messages.append(m)
+            results.append(await es.search(index=index, query=query, size=100, sort=sort))
 
     else:
-        with concurrent.futures.ThreadPoolExecutor() as e:
-            fut = []
-            for index in es.indices.get(index=".ds-logs-generic-default-*"):
-                fut.append(
-                    e.submit(es.search, index=index, query=query, size=max_log_messages, sort=sort)
-                )
+        results = await asyncio.gather(
+            *(
+                es.search(index=index, query=query, size=max_log_messages, sort=sort)
+                for index in indices
+            ),
+            return_exceptions=True,
+        )
 
-            for r in concurrent.futures.as_completed(fut):
-                try:
-                    data = r.result()
-                    messages = data["hits"]["hits"]
-                    for message in messages:
-                        source = message["_source"]
-                        m = {
-                            "datetime": source["@timestamp"],
-                            "message": source["json"]["message"],
-                            "level": source["json"].get("level"),
-                        }
-                        relevant_messages.append(m)
-                except json.decoder.JSONDecodeError as e:
-                    pass
+    relevant_messages = []
+    for result in results:
+        if isinstance(result, SerializationError):  # skip responses that can't be decoded
+            continue
+        if isinstance(result, BaseException):
+            raise result
+
+        relevant_messages.extend(
+            {
+                "datetime": message["_source"]["@timestamp"],
+                "message": message["_source"]["json"]["message"],
+                "level": message["_source"]["json"].get("level"),
+            }
+            for message in result["hits"]["hits"]
+        )
 
     count = len(relevant_messages)
     logging.info(f"Checked logs for {workspace_name}: {count} found")
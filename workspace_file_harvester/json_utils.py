@@ -0,0 +1,14 @@
+import json
+
+import orjson
+
+
+def loads_json(raw_data: bytes):
+    """Parse JSON with orjson, falling back to json for NaN/Infinity literals orjson rejects"""
+    try:
+        return orjson.loads(raw_data)
+    except orjson.JSONDecodeError as e:
+        try:
+            return json.loads(raw_data)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise e from None
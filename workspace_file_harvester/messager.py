@@ -1,9 +1,9 @@
-import json
 import logging
 from json import JSONDecodeError
 from typing import Sequence
 
 from eodhp_utils.messagers import Messager
+from json_utils import loads_json
 
 entry_type_dict = {"Collection": "collections", "Catalog": "catalogs", "Feature": "items"}
 
@@ -26,7 +26,7 @@ class FileHarvesterMessager(Messager[str]):
         for key, value in harvested_data.items():
 
             try:
-                data = json.loads(value)
+                data = loads_json(value)
                 links = data.get("links", [])
                 parent_link = next((item for item in links if item["rel"] == "parent"), None)
 
@@ -53,9 +53,9 @@ class FileHarvesterMessager(Messager[str]):
 
                 # return action to save file to S3
                 # bucket defaults to self.output_bucket
-                logging.info(path)
+                logging.debug(path)
                 action = Messager.OutputFileAction(
-                    file_body=json.dumps(data),
+                    file_body=value.decode(),
                     cat_path=f"{path}.json",
                 )
                 action_list.append(action)